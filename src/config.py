@@ -4,9 +4,21 @@ This loads and validates configurations for endpoints and garak probes from YAML
 """
 
 # Imported modules
+import functools # For caching ConfigLoader instances in load_config
+import json # For the parsed-config cache (JSON loads much faster than YAML)
 import yaml # For parsing YAML
 from pathlib import Path # For working with file paths cross-platform
-from typing import Dict, List, Any # Type hints for clarity
+from typing import Dict, Tuple, Any # Type hints for clarity
+
+# Use the libyaml C parser when PyYAML was built with it (much faster),
+# otherwise fall back to the pure-Python SafeLoader
+# Both are "safe" loaders - neither allows arbitrary code execution
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Sections that MUST be in the config file
+# A frozenset so validation is a single C-level set difference, and built
+# once here rather than on every load
+REQUIRED_SECTIONS = frozenset(('endpoints', 'probes', 'scan_settings'))
 
 
 class ConfigLoader:
@@ -24,10 +36,26 @@ class ConfigLoader:
         self.config_path = Path(config_path)
 
         # Holds our parsed config data (Starts as None)
-        self.config = None
+        # The file isn't read until something actually asks for the config,
+        # so paths like --help that never touch it pay no parse cost
+        self._config = None
+
+        # Enabled-only views of each section, built in one pass by _load_config
+        # Tuples (not lists) so callers can't accidentally mutate the cache
+        self._enabled_endpoints = None
+        self._enabled_probes = None
+        self._probe_names = None
+
 
-        # Load the config file immediately when the object is created
-        self._load_config()
+    @property
+    def config(self) -> Dict[str, Any]:
+        """
+        The parsed configuration dictionary
+        Loaded lazily: the YAML file is only read on first access
+        """
+        if self._config is None:
+            self._load_config()
+        return self._config
 
 
     def _load_config(self) -> None:
@@ -46,69 +74,129 @@ class ConfigLoader:
                 f"Configuration file not found: {self.config_path}"
             )
         
-        try:
-            # Open the file in read mode ('r')
-            with open(self.config_path, 'r') as f:
+        # Sidecar cache file next to the YAML (e.g. endpoints.yaml.cache.json)
+        # The YAML rarely changes, and parsing JSON is much cheaper than YAML
+        cache_path = self.config_path.with_suffix(
+            self.config_path.suffix + '.cache.json'
+        )
+
+        # Use the cache only if it's at least as new as the YAML file
+        loaded_from_cache = False
+        if (cache_path.exists()
+                and cache_path.stat().st_mtime >= self.config_path.stat().st_mtime):
+            try:
+                with open(cache_path, 'r') as f:
+                    self._config = json.load(f)
+                # Cache hit - skip the YAML parse entirely
+                loaded_from_cache = True
+            except (json.JSONDecodeError, OSError):
+                # Corrupt or unreadable cache - fall through and reparse the YAML
+                pass
+
+        if not loaded_from_cache:
+            try:
+                # Read the whole file into memory in one go ('rb' = raw bytes)
+                # Feeding the loader a single buffer instead of a file object
+                # avoids repeated read() calls inside the parser, and libyaml
+                # decodes the UTF-8 bytes itself
+                with open(self.config_path, 'rb') as f:
+                    data = f.read()
                 # Parse the YAML and store it in self.config
-                # safe_load prevents arbitrary code execution
-                self.config = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            # If the YAML is malformed, raise a clear error
-            raise ValueError(f"Invalid YAML in config file: {e}")
-        
+                # The Loader picked above keeps safe_load's safety guarantees
+                self._config = yaml.load(data, Loader=Loader)
+            except yaml.YAMLError as e:
+                # If the YAML is malformed, raise a clear error
+                raise ValueError(f"Invalid YAML in config file: {e}")
+
+            # Refresh the cache so the next load can skip the YAML parse -
+            # but only when JSON represents the config faithfully. Some YAML
+            # values raise during encoding (dates; NaN with allow_nan=False),
+            # and others are silently changed (a non-string key like `2024:`
+            # becomes the string "2024"), which would make a cache hit load
+            # different data than the YAML parse. A round-trip compare
+            # catches both kinds; writing stays best-effort either way
+            try:
+                encoded = json.dumps(self._config, allow_nan=False)
+                cacheable = json.loads(encoded) == self._config
+            except (TypeError, ValueError):
+                cacheable = False
+            if cacheable:
+                try:
+                    with open(cache_path, 'w') as f:
+                        f.write(encoded)
+                except OSError:
+                    pass
+
         # After loading, validate that required sections are present
         self._validate_config()
 
+        # Partition each section into its enabled-only view in one pass here,
+        # so the getters never have to re-filter no matter how often they run
+        # ep.get('enabled', False) means: get the 'enabled' value, default to False if missing
+        self._enabled_endpoints = tuple(
+            ep for ep in self._config.get('endpoints', [])
+            if ep.get('enabled', False)
+        )
+        self._enabled_probes = tuple(
+            probe for probe in self._config.get('probes', [])
+            if probe.get('enabled', False)
+        )
+        self._probe_names = tuple(
+            probe['name'] for probe in self._enabled_probes
+        )
+
 
     def _validate_config(self) -> None:
         """
         Validate that required configuration sections exist
         This ensures the config file has the structure we expect
         """
-        # List of sections that MUST be in the config file
-        required_sections = ['endpoints', 'probes', 'scan_settings']
-
-        #Loop through each required section
-        for section in required_sections:
-            # Check if the section exists in the loaded config
-            if section not in self.config: 
-                # If missing, raise an error
-                raise ValueError(
-                    f"Missing required section '{section}' in config file"
-                )
+        # The top level must be a mapping before we can check its sections -
+        # an empty file or a top-level list parses fine but isn't a valid config
+        if not isinstance(self._config, dict):
+            raise ValueError(
+                f"Config file must be a YAML mapping of sections, "
+                f"got {type(self._config).__name__}"
+            )
+
+        # One set difference finds every missing section at once,
+        # instead of looping over the required names in Python
+        missing = REQUIRED_SECTIONS - self._config.keys()
+        if missing:
+            # If any are missing, raise an error naming all of them
+            raise ValueError(
+                f"Missing required sections in config file: {sorted(missing)}"
+            )
 
     
-    def get_enabled_endpoints(self) -> List[Dict[str, Any]]:
+    def get_enabled_endpoints(self) -> Tuple[Dict[str, Any], ...]:
         """
         Get list of enabled endpoints
         Filters out any endpoints where enabled=False
-        
+        The filtered result is cached, so repeat calls are free
+
         Returns:
-            List of endpoint configurations where enabled=True
+            Tuple of endpoint configurations where enabled=True
             Each endpoint is a dictionary with keys like 'name', 'type', 'model', etc.
             """
-        # Get the 'endpoints' section
-        endpoints = self.config.get('endpoints',[])
+        if self._enabled_endpoints is None:
+            self._load_config()
+        return self._enabled_endpoints
 
-        # List comprehension: filter to only include endpoints where enabled is True
-        # ep.get('enabled', False) means: get the 'enabled' value, default to False if missing
-        return [ep for ep in endpoints if ep.get('enabled', False)]
 
-    
-    def get_enabled_probes(self) -> List[Dict[str, Any]]:
+    def get_enabled_probes(self) -> Tuple[Dict[str, Any], ...]:
         """
         Get a list of the enabled garak probes
         Filters out any probes where enabled=False
+        The filtered result is cached, so repeat calls are free
 
         Returns:
-            List of probe configurations where enabled=True
+            Tuple of probe configurations where enabled=True
             Each probe is a dictionary with keys like 'name', owasp_mapping', etc.
         """
-        # Get the 'probes' section
-        probes = self.config.get('probes', [])
-
-        # Filter for only enabled probes. Same as endpoints
-        return [probe for probe in probes if probe.get('enabled', False)]
+        if self._enabled_probes is None:
+            self._load_config()
+        return self._enabled_probes
 
 
     def get_scan_settings(self) -> Dict[str, Any]:
@@ -123,23 +211,28 @@ class ConfigLoader:
         return self.config.get('scan_settings',{})
     
 
-    def get_probe_names(self) -> List[str]:
+    def get_probe_names(self) -> Tuple[str, ...]:
         """
         Get list of enabled garak probe names
         Extracts onle the 'name' field from each enabled probe
         This is what we'll pass to garak when running scans
+        The result is cached, so repeat calls are free
 
         Returns:
-            List of probe names as strings (e.g. ['promptinject', 'xss', etc.])
+            Tuple of probe names as strings (e.g. ('promptinject', 'xss', etc.))
         """
-        # Get all enabled probes (returns a list of dictionaries)
-        probes = self.get_enabled_probes()
-
-        # Extract just the 'name' field from each probe dictionary
-        # This is a list comprehension that transforms the list
-        return [probe['name'] for probe in probes]
+        if self._probe_names is None:
+            self._load_config()
+        return self._probe_names
     
 
+# Cache of already-built ConfigLoader instances
+# Keyed by absolute path AND mtime, so editing the YAML busts the cache
+@functools.lru_cache(maxsize=32)
+def _cached_loader(path_str: str, mtime: float) -> ConfigLoader:
+    return ConfigLoader(path_str)
+
+
 # Convenience function for quick loading
 # Reads like a more natural command (e.g. config = load_config() reads better than config = ConfigLoader())
 def load_config(config_path: str = "config/endpoints.yaml") -> ConfigLoader:
@@ -148,11 +241,16 @@ def load_config(config_path: str = "config/endpoints.yaml") -> ConfigLoader:
     Helper function so you can load the config in one line
     Instead of: config = ConfigLoader("config/endpoints.yaml")
     You can do: config = load_config()
-    
+
+    Repeated calls with the same (unchanged) file return the same cached
+    ConfigLoader, so the YAML is only read and parsed once per process
+
     Args:
         config_path: Path to configuration file
-        
+
     Returns:
         Config Loader instance (an object with all our config data)
     """
-    return ConfigLoader(config_path)
\ No newline at end of file
+    # Resolve to an absolute path so relative and absolute spellings share a cache entry
+    path = Path(config_path).resolve()
+    return _cached_loader(str(path), path.stat().st_mtime)
\ No newline at end of file
@@ -3,12 +3,69 @@ Garak Scanner Wrapper
 Wraps garak vulnerability scanner to make it easy to scan AI endpoints
 """
 
+import shutil # For locating the garak executable on PATH
+import sys # For echoing streamed garak output to the terminal
+import threading # Lock so only one in-process garak call runs at a time
+import traceback # For recording in-process garak crashes in the output
+from concurrent.futures import ThreadPoolExecutor # For scanning endpoints in parallel
+import io # StringIO buffer for captured garak output
 import subprocess # For running garak as a command (like Terminal)
-import json # For parsing garak's JSON output files 
+import json # For parsing garak's JSON output files
+from itertools import chain # For flattening the per-probe argument pairs
 from pathlib import Path # For handling file paths
 from typing import Dict, List, Any, Optional # Type hints
 
-from src.config import ConfigLoader 
+from src.config import ConfigLoader
+
+
+# Maps each endpoint 'type' to a function building its garak model arguments
+# A dict lookup instead of an if-chain: O(1), and adding a new endpoint type
+# is just one new entry here. Unknown types now fail loudly instead of
+# silently producing a garak command with no model
+_TYPE_HANDLERS = {
+    'huggingface': lambda ep: [
+        "--model_type", "huggingface",
+        "--model_name", ep['model']
+    ],
+}
+
+# garak's CLI works against process-global state (including sys.stdout while
+# we capture it), so only one in-process call may run at a time - scan_all's
+# worker threads serialize on this lock
+_GARAK_LOCK = threading.Lock()
+
+
+class _ThreadLocalStream:
+    """
+    Stand-in for sys.stdout/sys.stderr that routes writes per thread
+    The thread running garak redirects its writes into a capture buffer;
+    every other thread (e.g. scan_all workers printing their banners)
+    keeps writing to the real stream. Anyone who grabbed a reference to
+    this proxy keeps working after the capture ends, because writes fall
+    back to the real stream once the redirect is cleared
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def redirect(self, stream) -> None:
+        """Send this thread's writes to the given stream"""
+        self._local.stream = stream
+
+    def _current(self):
+        return getattr(self._local, 'stream', None) or self._fallback
+
+    def write(self, text):
+        return self._current().write(text)
+
+    def flush(self):
+        self._current().flush()
+
+    def __getattr__(self, name):
+        # Anything else callers poke at (isatty, encoding, ...) comes
+        # from whichever stream this thread is writing to
+        return getattr(self._current(), name)
 
 
 class GarakScanner:
@@ -17,47 +74,70 @@ class GarakScanner:
     def __init__(self, config: ConfigLoader):
         """
         Initialize the scanner with configuration
-        
+
         Args:
             config: ConfigLoader instance with endpoints and probes
         """
         self.config = config
         self.scan_settings = config.get_scan_settings()
 
+        # The probe list and scan settings don't change between endpoints,
+        # so build that part of the garak command once here -
+        # _build_garak_command only has to prepend the endpoint arguments
+        probes = config.get_probe_names()
+        self._cmd_suffix = tuple(
+            chain.from_iterable(("--probes", probe) for probe in probes)
+        ) + (
+            "--generations", str(self.scan_settings.get('generations', 5)),
+            "--report_prefix", self.scan_settings.get('output_dir', 'results'),
+        )
+
+        # Resolve the garak executable once so each spawn skips the OS's
+        # PATH walk; fall back to the bare name and let exec report a
+        # missing binary (the in-process path below may not need it at all)
+        self._garak_bin = shutil.which("garak") or "garak"
+
+        # If garak is importable, call it in-process instead of spawning a
+        # new interpreter per scan - spawning pays fork/exec plus garak's
+        # own import time (seconds) on every endpoint
+        try:
+            from garak.cli import main as garak_main
+            self._garak_main = garak_main
+        except ImportError:
+            # garak only available as a command - fall back to subprocess
+            self._garak_main = None
+
 
 
-    def _build_garak_command(self, endpoint: Dict[str, Any], probes: List[str]) -> List[str]:
+    def _build_garak_command(self, endpoint: Dict[str, Any]) -> List[str]:
         """
         Build the garak command as a list of arguments
+        Only the endpoint part varies - the probe/settings suffix was
+        precomputed in __init__
 
         Args:
             endpoint: Endpoint configuration dictionary
-            probes: List of probe names to run
 
         Returns:
             List of command arguments for subprocess
         """
-        # Start with the base garak command
-        cmd = ["garak"]
-
-        # Add LLM model type and name based on the endpoint config
-        if endpoint['type'] == 'huggingface':
-            cmd.extend([
-                "--model_type", "huggingface",
-                "--model_name", endpoint['model']
-            ])
-        
-        # Add each probe
-        for probe in probes:
-            cmd.extend(["--probes", probe])
+        # Start with the resolved garak executable
+        cmd = [self._garak_bin]
 
-        # Add the number of generations from settings
-        generations = self.scan_settings.get('generations', 5)
-        cmd.extend(["--generations", str(generations)])
+        # Look up the handler for this endpoint type and let it build
+        # the model arguments
+        try:
+            handler = _TYPE_HANDLERS[endpoint['type']]
+        except KeyError:
+            raise ValueError(
+                f"Unsupported endpoint type '{endpoint['type']}' "
+                f"for endpoint '{endpoint.get('name', '?')}' "
+                f"(supported: {sorted(_TYPE_HANDLERS)})"
+            ) from None
+        cmd.extend(handler(endpoint))
 
-        # Add the output scan results directory
-        output_dir = self.scan_settings.get('output_dir', 'results')
-        cmd.extend(["--report_prefix", output_dir])
+        # Append the precomputed probes/generations/output arguments
+        cmd.extend(self._cmd_suffix)
 
         return cmd
     
@@ -65,31 +145,95 @@ class GarakScanner:
     
     def _run_garak(self, cmd: List[str]) -> subprocess.CompletedProcess:
         """
-        Run garak command using subprocess
-        
+        Run a garak command - in-process when garak is importable,
+        otherwise as a subprocess
+
         Args:
             cmd: List of command arguments
-            
+
         Returns:
             CompletedProcess object with results
         """
         print(f"Running garak command: {' '.join(cmd)}")
 
-        try:
-            # Run the command and capture output
-            result = subprocess.run(
+        if self._garak_main is not None:
+            # In-process path: hand garak's CLI its arguments directly
+            # (cmd[1:] drops the executable name) and capture what it prints
+            buffer = io.StringIO()
+            returncode = 0
+            with _GARAK_LOCK:
+                # Capture both streams - stderr too, matching the subprocess
+                # path's merged stream - through thread-local proxies, so
+                # only THIS thread's writes land in the buffer while other
+                # threads keep printing to the terminal. Always restore the
+                # real streams, even if garak blows up
+                real_stdout, real_stderr = sys.stdout, sys.stderr
+                out_proxy = _ThreadLocalStream(real_stdout)
+                err_proxy = _ThreadLocalStream(real_stderr)
+                out_proxy.redirect(buffer)
+                err_proxy.redirect(buffer)
+                sys.stdout, sys.stderr = out_proxy, err_proxy
+                try:
+                    self._garak_main(cmd[1:])
+                except SystemExit as e:
+                    # garak's CLI may sys.exit(); treat the code as the
+                    # returncode. A bare sys.exit() carries None, which a
+                    # real subprocess reports as exit status 0, so keep that
+                    if e.code is None:
+                        returncode = 0
+                    elif isinstance(e.code, int):
+                        returncode = e.code
+                    else:
+                        returncode = 1
+                except Exception:
+                    # Any other garak failure becomes a failed result with
+                    # the traceback in the output, just like a subprocess
+                    # crash shows up as a nonzero exit with its stderr
+                    traceback.print_exc(file=buffer)
+                    returncode = 1
+                finally:
+                    sys.stdout, sys.stderr = real_stdout, real_stderr
+                    # Clear the redirects too: anything that kept a
+                    # reference to a proxy (e.g. a logging handler garak
+                    # bound to the then-current sys.stdout) falls back to
+                    # the real stream instead of the finished buffer
+                    out_proxy.redirect(None)
+                    err_proxy.redirect(None)
+            # Package the output like subprocess.run would, so callers
+            # see the same .returncode / .stdout interface either way
+            result = subprocess.CompletedProcess(
+                cmd, returncode, stdout=buffer.getvalue(), stderr=''
+            )
+        else:
+            # Subprocess path: stream output line by line instead of
+            # buffering everything until garak exits - long probe runs can
+            # produce many MB, and streaming shows progress immediately
+            process = subprocess.Popen(
                 cmd,
-                capture_output=True, # Capture stdout and stderr
-                text=True,           # Return strings instead of bytes
-                check=True           # Raise error if command fails
+                stdout=subprocess.PIPE,      # Capture stdout through a pipe
+                stderr=subprocess.STDOUT,    # Merge stderr into the same stream
+                text=True,                   # Return strings instead of bytes
+                bufsize=1                    # Line-buffered
             )
-            return result
-        
-        # Error handling
-        except subprocess.CalledProcessError as e:
-            print(f"Error running garak: {e}")
-            print(f"Output: {e.output}")
-            raise
+            lines = []
+            for line in process.stdout:
+                # Echo to the terminal as it arrives, and keep a copy
+                sys.stdout.write(line)
+                lines.append(line)
+            process.wait()
+            # Package the output like subprocess.run would, matching the
+            # in-process path above
+            result = subprocess.CompletedProcess(
+                cmd, process.returncode, stdout=''.join(lines), stderr=''
+            )
+
+        # Report failures instead of raising - scan_endpoint records
+        # success from the returncode
+        if result.returncode != 0:
+            print(f"Error running garak (exit code {result.returncode})")
+            print(f"Output: {result.stdout}")
+
+        return result
 
 
 
@@ -109,10 +253,24 @@ class GarakScanner:
         
         # Get the list of probe names from config
         probes = self.config.get_probe_names()
+
+        # Nothing to do without probes - don't launch garak at all, since it
+        # would still initialize the model (possibly downloading weights!)
+        # just to run zero probes
+        if not probes:
+            print("No probes enabled - skipping")
+            return {
+                'endpoint': endpoint['name'],
+                'probes_run': [],
+                'success': True,
+                'output': '',
+                'skipped': 'no enabled probes'
+            }
+
         print(f"Running {len(probes)} probes: {', '.join(probes)}")
         
         # Build the garak command
-        cmd = self._build_garak_command(endpoint, probes)
+        cmd = self._build_garak_command(endpoint)
         
         # Run garak
         result = self._run_garak(cmd)
@@ -123,4 +281,52 @@ class GarakScanner:
             'probes_run': probes,
             'success': result.returncode == 0,
             'output': result.stdout
-        }
\ No newline at end of file
+        }
+
+
+    def scan_all(self) -> List[Dict[str, Any]]:
+        """
+        Scan every enabled endpoint, running scans in parallel
+
+        Parallelism only helps on the subprocess path, where each thread
+        just waits on an external garak process - there, total wall time
+        is roughly the slowest scan rather than the sum of all scans.
+        When garak runs in-process (the default whenever it's importable),
+        scans serialize on _GARAK_LOCK and the GIL, so they run one at a
+        time regardless of the worker count
+
+        Returns:
+            List of scan result dictionaries, one per enabled endpoint,
+            in the same order as the config
+        """
+        endpoints = self.config.get_enabled_endpoints()
+
+        # The 'parallel' setting may be a worker count, or a plain
+        # true/false toggle (true = a sensible default, false = one at a time)
+        parallel = self.scan_settings.get('parallel', 1)
+        if parallel is True:
+            max_workers = 4
+        elif parallel:
+            max_workers = int(parallel)
+        else:
+            max_workers = 1
+
+        def scan_one(endpoint: Dict[str, Any]) -> Dict[str, Any]:
+            # One bad endpoint (e.g. an unsupported type) shouldn't throw
+            # away the results of every other scan in the batch - turn its
+            # exception into a failed result and keep going
+            try:
+                return self.scan_endpoint(endpoint)
+            except Exception as e:
+                print(f"Error scanning {endpoint.get('name', '?')}: {e}")
+                return {
+                    'endpoint': endpoint.get('name', '?'),
+                    'probes_run': [],
+                    'success': False,
+                    'output': '',
+                    'error': str(e)
+                }
+
+        # map() preserves the endpoint order in the results
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(scan_one, endpoints))
\ No newline at end of file